@@ -1,4 +1,5 @@
-from .env.beergame import env
+from .env.beergame import env, parallel_env
+from .env.vec_beergame import BeerGameVecEnv
 from .beergame_v0 import beergame_v0
 
-__all__ = ['env', 'beergame_v0']
\ No newline at end of file
+__all__ = ['env', 'parallel_env', 'beergame_v0', 'BeerGameVecEnv']
\ No newline at end of file
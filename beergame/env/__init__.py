@@ -1,3 +1,4 @@
-from .beergame import env
+from .beergame import env, parallel_env
+from .vec_beergame import BeerGameVecEnv
 
-__all__ = ['env']
\ No newline at end of file
+__all__ = ['env', 'parallel_env', 'BeerGameVecEnv']
\ No newline at end of file
@@ -1,17 +1,49 @@
 # Directory: beergame/
 # File: beergame/env/beergame.py
 import pygame
-import functools
 import numpy as np
 from gymnasium.spaces import Box, Dict
-from pettingzoo import AECEnv
+from pettingzoo import AECEnv, ParallelEnv
 from pettingzoo.utils import agent_selector, wrappers
 from .renderer import BeerGameRenderer
 
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def _update_state_kernel(inventory, backorders, orders, incoming, customer_order, ship_out):
+    """
+    Advance the shipment cascade of one week in place and return the
+    quantity shipped to the customer. Compiled with Numba when available.
+    """
+    # Receive orders from the customer and from downstream neighbours
+    backorders[0] += customer_order
+    backorders[1:] += orders[:-1]
+
+    # Receive shipments, then ship as much as possible downstream
+    # (all outstanding orders, limited by stock: min(inventory, backorders))
+    inventory += incoming
+    np.minimum(inventory, backorders, ship_out)
+    inventory -= ship_out
+    backorders -= ship_out
+
+    # Each echelon receives what its upstream neighbour shipped;
+    # the factory's incoming shipments are based on its own orders
+    incoming[:-1] = ship_out[1:]
+    incoming[-1] = orders[-1]
+
+    return ship_out[0]
+
+
+if njit is not None:
+    _update_state_kernel = njit(cache=True)(_update_state_kernel)
+
 
 class raw_env(AECEnv):
     metadata = {
-        "render_modes": ["human", "rgb_array"],
+        "render_modes": ["human", "rgb_array", "rgb_array_fast"],
         "name": "beergame_v0",
         "render_fps": 2,
     }
@@ -27,16 +59,19 @@ class raw_env(AECEnv):
                 base_demand=8.0,
                 seed=None):
         """Initialize the Beer Game environment."""
-        if seed is not None:
-            np.random.seed(seed)
+        self._rng = np.random.default_rng(seed)
             
         self.render_mode = render_mode
         if self.render_mode == "rgb_array":
             self.renderer = BeerGameRenderer()
+        elif self.render_mode == "rgb_array_fast":
+            # Schematic frame drawn with NumPy only: a bar pair per actor and a week progress bar
+            self._fast_background = np.full((768, 1024, 3), 245, dtype=np.uint8)
+            self._fast_bar_scale = 5.0  # pixels per unit of stock or backorders
         
         self.num_players = 4
-        self.holding_cost = holding_cost
-        self.backorder_cost = backorder_cost
+        # Costs as one (2, 4) block: holding and backorder cost per agent
+        self._costs = np.array([holding_cost, backorder_cost], dtype=np.float32)
         self.init_inv_level = init_inv_level
         self.init_orders = init_orders
         self.init_shipments = init_shipments
@@ -45,41 +80,73 @@ class raw_env(AECEnv):
         self.total_beers = 0
         
         self.possible_agents = ["retailer", "wholesaler", "distributor", "factory"]
+        self._agent_idx = {agent: i for i, agent in enumerate(self.possible_agents)}
+
+        # Per-agent episode containers, created once and refilled in place on every reset
+        self.agents = self.possible_agents[:]
+        self._zero_dict = dict.fromkeys(self.possible_agents, 0)
+        self._false_dict = dict.fromkeys(self.possible_agents, False)
+        self.rewards = dict(self._zero_dict)
+        self._cumulative_rewards = dict(self._zero_dict)
+        self.terminations = dict(self._false_dict)
+        self.truncations = dict(self._false_dict)
+
+        # Game state as one contiguous block, one row per field and one column
+        # per agent; the named arrays are row views and are only updated in place
+        self._state = np.zeros((4, self.num_players), dtype=np.float32)
+        self._bind_state_views()
+        self._ship_buf = np.empty(self.num_players, dtype=np.float32)
+        self._customer = np.zeros(2, dtype=np.float32)  # orders, incoming_shipments
+
+        # Customer demand parameters
+        self._season_amp = 2.0
+        self._noise_std = 1.0
+        self._spike_p = 0.1
+        self._max_spike = 10.0
+
+        # Seasonal demand component for each week of the 52 weeks cycle
+        self._seasonal_table = self._season_amp * np.sin(2 * np.pi * np.arange(52) / 52)
         
-        self._action_spaces = {
-            agent: Box(low=0, high=50, shape=(1,), dtype=np.float32)
-            for agent in self.possible_agents
-        }
+        # Spaces are identical for every agent, so a single instance is shared
+        action_space = Box(low=0, high=50, shape=(1,), dtype=np.float32)
+        self._action_spaces = dict.fromkeys(self.possible_agents, action_space)
         
         # Keep the dictionary structure for reference and clarity
-        self._observation_spaces_dict = {
-            agent: {
-                "inventory": Box(low=0, high=float('inf'), shape=(1,)),
-                "backorders": Box(low=0, high=float('inf'), shape=(1,)),
-                "orders": Box(low=0, high=float('inf'), shape=(1,)),
-                "incoming_shipments": Box(low=0, high=float('inf'), shape=(1,)),
-                "holding_cost": Box(low=0, high=float('inf'), shape=(1,)),
-                "backorder_cost": Box(low=0, high=float('inf'), shape=(1,))
-            }
-            for agent in self.possible_agents
+        value_box = Box(low=0, high=float('inf'), shape=(1,))
+        observation_space_dict = {
+            "inventory": value_box,
+            "backorders": value_box,
+            "orders": value_box,
+            "incoming_shipments": value_box,
+            "holding_cost": value_box,
+            "backorder_cost": value_box
         }
+        self._observation_spaces_dict = dict.fromkeys(self.possible_agents, observation_space_dict)
         
         # Convert to Box space
         # Each agent has 6 values (inventory, backorders, orders, incoming_shipments, holding_cost, backorder_cost)
-        self._observation_spaces = {
-            agent: Box(
-                low=0,
-                high=float('inf'),
-                shape=(6,),  # Combined shape for all values
-                dtype=np.float32
-            )
-            for agent in self.possible_agents
-        }
-        
-        self.customer = {
-            "orders": 0,
-            "incoming_shipments": 0,
-        }
+        observation_space = Box(
+            low=0,
+            high=float('inf'),
+            shape=(6,),  # Combined shape for all values
+            dtype=np.float32
+        )
+        self._observation_spaces = dict.fromkeys(self.possible_agents, observation_space)
+
+    def _bind_state_views(self):
+        """Bind the named state and cost arrays as row views of their blocks."""
+        self.inventory_levels = self._state[0]
+        self.backorders = self._state[1]  # Track backorders separately
+        self.orders = self._state[2]
+        self.incoming_shipments = self._state[3]
+        self.holding_cost = self._costs[0]
+        self.backorder_cost = self._costs[1]
+
+    def __setstate__(self, state):
+        # Copies and unpickled arrays no longer alias each other, so bind the row views again
+        self.__dict__.update(state)
+        self._bind_state_views()
+
     def _observation_dict_to_space(self, obs_dict):
         """Convert dictionary observation to Box space format"""
         # Define order of keys to ensure consistent conversion
@@ -87,16 +154,12 @@ class raw_env(AECEnv):
                 "holding_cost", "backorder_cost"]
         
         # Flatten all values into a single array
-        flat_obs = np.array([
-            obs_dict[key][0] for key in keys
-        ], dtype=np.float32)
+        flat_obs = np.concatenate([obs_dict[key] for key in keys])
         
         return flat_obs
-    @functools.lru_cache(maxsize=None)
     def action_space(self, agent):
         return self._action_spaces[agent]
 
-    @functools.lru_cache(maxsize=None)
     def observation_space(self, agent):
         return self._observation_spaces[agent]
 
@@ -109,26 +172,36 @@ class raw_env(AECEnv):
         - Random fluctuations
         - Occasional demand spikes
         """
-        # Base demand parameters
-        base_demand = self.base_demand
-        seasonal_amplitude = 2.0
-        random_noise_std = 1.0
-        spike_probability = 0.1
-        max_spike = 10.0
-
-        # Calculate seasonal component using sine wave (52 weeks cycle)
-        seasonal_factor = seasonal_amplitude * np.sin(2 * np.pi * self.week / 52)
+        # Look up seasonal component (sine wave over a 52 weeks cycle)
+        seasonal_factor = self._seasonal_table[self.week % 52]
         
         # Generate random noise
-        random_noise = np.random.normal(0, random_noise_std)
+        random_noise = self._rng.normal(0.0, self._noise_std)
         
         # Occasionally add demand spikes
-        spike = max_spike * np.random.binomial(1, spike_probability)
+        spike = self._max_spike * self._rng.binomial(1, self._spike_p)
         
         # Combine all components and ensure non-negative demand
-        demand = max(0, base_demand + seasonal_factor + random_noise + spike)
+        demand = max(0, self.base_demand + seasonal_factor + random_noise + spike)
         
         return float(demand)
+    def _set_order(self, agent_idx, action):
+        """Store an agent's action as its order for the current week."""
+        # Handle different action formats
+        # Assign straight into the float32 slot, without a round trip through a Python float
+        try:
+            # Will work for any sequence type (list, numpy array, protobuf repeated container)
+            self.orders[agent_idx] = action[0]
+        except (TypeError, IndexError):
+            # If action is not a sequence or is empty, try to convert directly
+            self.orders[agent_idx] = action
+
+    def _check_action(self, agent, action):
+        """Raise ValueError if an order is outside the agent's action space."""
+        space = self._action_spaces[agent]
+        if not space.contains(np.asarray(action, dtype=space.dtype).reshape(space.shape)):
+            raise ValueError(f"Action {action!r} of {agent} is not in its action space {space}")
+
     def step(self, action):
         """Execute one step in the environment."""
         if (
@@ -138,23 +211,11 @@ class raw_env(AECEnv):
             return self._was_dead_step(action)
 
         agent = self.agent_selection
-        agent_idx = self.possible_agents.index(agent)
-        
-
-        # Handle different action formats
-        try:
-            # Will work for any sequence type (list, numpy array, protobuf repeated container)
-            self.orders[agent_idx] = float(action[0])
-        except (TypeError, IndexError):
-            # If action is not a sequence or is empty, try to convert directly
-            self.orders[agent_idx] = float(action)
+        agent_idx = self._agent_idx[agent]
+        self._set_order(agent_idx, action)
         
         if self._agent_selector.is_last():
-            self._update_state()
-            self.week += 1
-            
-            if self.week >= 52:
-                self.terminations = {agent: True for agent in self.agents}
+            self._advance_week()
 
         reward = self._calculate_reward(agent_idx)
         self.rewards[agent] = reward
@@ -162,21 +223,91 @@ class raw_env(AECEnv):
         self._cumulative_rewards[agent] = 0
         self.agent_selection = self._agent_selector.next()
         self._accumulate_rewards()
+
+    def _advance_week(self):
+        """Update the state once all orders are in and move to the next week."""
+        self._update_state()
+        self.week += 1
+        
+        if self.week >= 52:
+            self.terminations.update(dict.fromkeys(self.agents, True))
+
+    def batched_step(self, actions):
+        """
+        Play a whole week at once, bypassing the per-agent AEC cycle.
+
+        Meant for trainers that pick the orders of all agents together; call it
+        at the start of a week (while the retailer is selected) in place of
+        four step() calls. Afterwards rewards, _cumulative_rewards and
+        terminations hold the same values as after those four calls, so last()
+        stays consistent.
+
+        Args:
+            actions (np.ndarray): Orders of shape (4,), from retailer to factory
+
+        Raises:
+            ValueError: If an order is outside the agent's action space
+            RuntimeError: If the episode has ended or a week is already in progress
+
+        Returns:
+            tuple: (observations, rewards, terminations, infos) where
+                observations and infos are lists in agent order, and rewards and
+                terminations are arrays of shape (4,) as of the end of the week
+        """
+        if self.week >= 52:
+            raise RuntimeError("batched_step() called after the episode ended, call reset() first")
+        if self.agent_selection != self.possible_agents[0]:
+            raise RuntimeError("batched_step() must be called at the start of a week")
+
+        actions = np.reshape(actions, self.num_players)
+        for agent, action in zip(self.possible_agents, actions):
+            self._check_action(agent, action)
+
+        # With step(), every agent but the last is rewarded before the week's update
+        week_rewards = self._reward_vec.tolist()
+        self.orders[:] = actions
+        self._advance_week()
+        week_rewards[-1] = float(self._reward_vec[-1])
+        self.rewards.update(zip(self.possible_agents, week_rewards))
+
+        # Each agent's cumulative reward is reset when it acts and then accumulated
+        # once per remaining step of the week. The repeated addition reproduces
+        # PettingZoo's float summation exactly; reward * (4 - i) can round differently
+        for i, (agent, reward) in enumerate(zip(self.possible_agents, week_rewards)):
+            cumulative = 0
+            for _ in range(self.num_players - i):
+                cumulative += reward
+            self._cumulative_rewards[agent] = cumulative
+
+        observations = [self.observe(agent) for agent in self.agents]
+        infos = [self.infos[agent] for agent in self.agents]
+        terminations = np.full(self.num_players, self.week >= 52)
+        return observations, self._reward_vec.copy(), terminations, infos
+
     def reset(self, seed=None, options=None):
         """Reset the environment to initial state."""
-        self.agents = self.possible_agents[:]
-        self.rewards = {agent: 0 for agent in self.agents}
-        self._cumulative_rewards = {agent: 0 for agent in self.agents}
-        self.terminations = {agent: False for agent in self.agents}
-        self.truncations = {agent: False for agent in self.agents}
+        if seed is not None:
+            self._rng = np.random.default_rng(seed)
+
+        # Dead agents are removed from these during an episode; clearing first
+        # restores the keys in agent order
+        self.agents[:] = self.possible_agents
+        for d in (self.rewards, self._cumulative_rewards):
+            d.clear()
+            d.update(self._zero_dict)
+        for d in (self.terminations, self.truncations):
+            d.clear()
+            d.update(self._false_dict)
         self.infos = {agent: {} for agent in self.agents}
         
         # Initialize game state
         self.week = 0
-        self.inventory_levels = np.array(self.init_inv_level, dtype=np.float32)
-        self.backorders = np.zeros(self.num_players, dtype=np.float32)  # New: track backorders separately
-        self.orders = np.array(self.init_orders, dtype=np.float32)
-        self.incoming_shipments = np.array(self.init_shipments, dtype=np.float32)
+        self.inventory_levels[:] = self.init_inv_level
+        self.backorders.fill(0)
+        self.orders[:] = self.init_orders
+        self.incoming_shipments[:] = self.init_shipments
+        self._customer.fill(0)
+        self._update_reward_vec()
         
         self._agent_selector = agent_selector(self.agents)
         self.agent_selection = self._agent_selector.next()
@@ -188,91 +319,160 @@ class raw_env(AECEnv):
         if agent not in self.agents:
             return None
             
-        agent_idx = self.possible_agents.index(agent)
-        
-        # Create dictionary observation first
-        obs_dict = {
-            "inventory": np.array([self.inventory_levels[agent_idx]], dtype=np.float32),
-            "backorders": np.array([self.backorders[agent_idx]], dtype=np.float32),
-            "orders": np.array([self.orders[agent_idx]], dtype=np.float32),
-            "incoming_shipments": np.array([self.incoming_shipments[agent_idx]], dtype=np.float32),
-            "holding_cost": np.array([self.holding_cost[agent_idx]], dtype=np.float32),
-            "backorder_cost": np.array([self.backorder_cost[agent_idx]], dtype=np.float32)
-        }
-        
-        # Convert to Box space format
-        return self._observation_dict_to_space(obs_dict)
+        # State column (inventory, backorders, orders, incoming_shipments) followed by the costs
+        agent_idx = self._agent_idx[agent]
+        return np.concatenate((self._state[:, agent_idx], self._costs[:, agent_idx]))
 
     def _update_state(self):
         """Update the game state after all agents have acted."""
-        # Initialize temporary array for incoming shipments to children
-        self.customer['orders'] = self._generate_customer_demand()
-        max_possible_shipment = np.zeros(self.num_players, dtype=np.float32)
-        # First loop: Process backorders and determine shipments
-        for i in range(self.num_players):
-            # Update backorders with orders from downstream
-            # For retailer (i=0), use customer orders
-            if i == 0:
-                self.backorders[i] += self.customer['orders']
-            else:
-                self.backorders[i] += self.orders[i-1]
-            
-            # Update inventory with production/shipments
-            self.inventory_levels[i] += self.incoming_shipments[i]
-            
-            # Calculate shipments to downstream
-            max_possible_shipment[i] = self.inventory_levels[i] - max(self.inventory_levels[i] - self.backorders[i], 0)
-            
-            # Update inventory and backorders
-            self.inventory_levels[i] -= max_possible_shipment[i]
-            self.backorders[i] -= max_possible_shipment[i]
-        
-        # Second loop: Update incoming shipments for each agent
-        for i in range(self.num_players):
-            if i == 0:
-                # Retailer ships to customer
-                self.customer['incoming_shipments'] = max_possible_shipment[i]
-                self.total_beers += max_possible_shipment[i]
-            else:
-                # Update incoming shipments for other agents
-                self.incoming_shipments[i-1] = max_possible_shipment[i]
-        
-        # Factory's incoming shipments are based on its orders
-        self.incoming_shipments[-1] = self.orders[-1]
+        self._customer[0] = self._generate_customer_demand()
+
+        # Retailer ships to customer
+        self._customer[1] = _update_state_kernel(
+            self.inventory_levels,
+            self.backorders,
+            self.orders,
+            self.incoming_shipments,
+            self._customer[0],
+            self._ship_buf,
+        )
+        self.total_beers += self._customer[1]
+
+        self._update_reward_vec()
+
+    def _update_reward_vec(self):
+        """Recompute the rewards of all agents from the current state."""
+        self._reward_vec = -(self.holding_cost * self.inventory_levels + self.backorder_cost * self.backorders)
 
     def _calculate_reward(self, agent_idx):
-        """Calculate reward for an agent based on costs."""
-        holding_cost = self.holding_cost[agent_idx] * self.inventory_levels[agent_idx]
-        backorder_cost = self.backorder_cost[agent_idx] * self.backorders[agent_idx]
-        
-        return -(holding_cost + backorder_cost)
+        """Return the reward of an agent based on costs, as of the last state update."""
+        return float(self._reward_vec[agent_idx])
 
     def render(self):
         """Render the current state of the environment."""
-        if self.render_mode == "rgb_array":
-            state = {
-                'week': self.week,
-                'inventory_levels': self.inventory_levels,
-                'backorders': self.backorders,  # Added backorders to rendering
-                'orders': self.orders,
-                'shipments': self.incoming_shipments,
-                'holding_cost': [self.holding_cost[i] * self.inventory_levels[i] 
-                               for i in range(self.num_players)],
-                'backorder_cost': [self.backorder_cost[i] * self.backorders[i]
-                                 for i in range(self.num_players)],
-                'customer': self.customer,
-                'total_beers': self.total_beers
-            }
-            return self.renderer.render(state)
-        else:
+        if self.render_mode == "rgb_array_fast":
+            return self._fast_render()
+        if self.render_mode != "rgb_array":
             return None
 
+        state = {
+            'week': self.week,
+            'inventory_levels': self.inventory_levels,
+            'backorders': self.backorders,  # Added backorders to rendering
+            'orders': self.orders,
+            'shipments': self.incoming_shipments,
+            'holding_cost': self.holding_cost * self.inventory_levels,
+            'backorder_cost': self.backorder_cost * self.backorders,
+            'customer': {
+                'orders': float(self._customer[0]),
+                'incoming_shipments': float(self._customer[1]),
+            },
+            'total_beers': self.total_beers
+        }
+        return self.renderer.render(state)
+
+    def _fast_render(self):
+        """
+        Render a schematic RGB array of the state without any text: for each
+        actor a green inventory bar and a red backorder bar, and a week
+        progress bar along the top. Meant for cheap frames during training.
+        """
+        frame = self._fast_background.copy()
+        height, width, _ = frame.shape
+        base = height - 40
+        max_bar = base - 80
+
+        # Week progress
+        frame[20:40, 20:20 + (width - 40) * min(self.week, 52) // 52] = (243, 156, 18)
+
+        # Inventory and backorder bars, one column per actor
+        bars = np.stack([self.inventory_levels, self.backorders]) * self._fast_bar_scale
+        bar_heights = np.clip(bars, 0, max_bar).astype(np.intp)
+        column = width // self.num_players
+        for i in range(self.num_players):
+            x = i * column + column // 2
+            frame[base - bar_heights[0, i]:base, x - 50:x - 5] = (46, 204, 113)
+            frame[base - bar_heights[1, i]:base, x + 5:x + 50] = (231, 76, 60)
+        return frame
+
     def close(self):
         if hasattr(self, 'renderer'):
             self.renderer.close()
 
+class raw_parallel_env(ParallelEnv):
+    """
+    Parallel API version of the Beer Game.
+
+    All four agents submit their orders at once and the week is advanced with
+    a single state update, so every reward reflects the state after that week.
+    Accepts the same keyword arguments as raw_env.
+    """
+    metadata = raw_env.metadata
+
+    def __init__(self, **kwargs):
+        self._env = raw_env(**kwargs)
+        self.render_mode = self._env.render_mode
+        self.possible_agents = self._env.possible_agents
+        self.agents = []
+
+    def action_space(self, agent):
+        return self._env.action_space(agent)
+
+    def observation_space(self, agent):
+        return self._env.observation_space(agent)
+
+    def reset(self, seed=None, options=None):
+        """Reset the environment and return the initial observations and infos."""
+        self._env.reset(seed=seed, options=options)
+        self.agents = self.possible_agents[:]
+        observations = {agent: self._env.observe(agent) for agent in self.agents}
+        infos = {agent: {} for agent in self.agents}
+        return observations, infos
+
+    def step(self, actions):
+        """Execute one week given the actions of all agents."""
+        if not self.agents:
+            # The episode is over: there is nobody left to step
+            return {}, {}, {}, {}, {}
+        if actions.keys() != set(self.agents):
+            raise ValueError(
+                f"Expected one action per live agent {self.agents}, got actions for {list(actions)}"
+            )
+
+        env = self._env
+        for agent, action in actions.items():
+            env._check_action(agent, action)
+        for agent, action in actions.items():
+            env._set_order(env._agent_idx[agent], action)
+
+        env._advance_week()
+        done = env.week >= 52
+
+        observations = {agent: env.observe(agent) for agent in self.agents}
+        rewards = {agent: env._calculate_reward(env._agent_idx[agent]) for agent in self.agents}
+        terminations = {agent: done for agent in self.agents}
+        truncations = {agent: False for agent in self.agents}
+        infos = {agent: {} for agent in self.agents}
+
+        if done:
+            self.agents = []
+
+        return observations, rewards, terminations, truncations, infos
+
+    def render(self):
+        return self._env.render()
+
+    def close(self):
+        self._env.close()
+
 from pettingzoo.utils import wrappers
 
+def parallel_env(**kwargs):
+    """
+    Creates the Beer Game environment with the parallel API.
+    """
+    return raw_parallel_env(**kwargs)
+
 def env(**kwargs):
     """
     The env function wraps the environment in 3 wrappers by default.
@@ -1,10 +1,38 @@
+import math
 import pygame
 import numpy as np
 import os
-from typing import Dict, List, Tuple
+from collections import OrderedDict
+from functools import partial
+from typing import List, Tuple
+
+# Images scaled to their display size, shipped next to the PNGs; regenerate with
+# BeerGameRenderer(use_assets=False).save_assets(path) when the images or layout change
+ASSETS_FILE = 'assets.npz'
+
+# Rotation by the 30 degree half-angle of arrow heads
+_COS_30 = math.cos(math.pi / 6)
+_SIN_30 = math.sin(math.pi / 6)
+
+
+def _arrow_head_points(start: tuple, end: tuple, arrow_size: float) -> list:
+    """Triangle of an arrow head at end, pointing away from start"""
+    dx = end[0] - start[0]
+    dy = end[1] - start[1]
+    length = math.hypot(dx, dy) or 1.0
+    ux, uy = dx / length, dy / length
+    return [
+        end,
+        (end[0] - arrow_size * (ux * _COS_30 + uy * _SIN_30),
+         end[1] - arrow_size * (uy * _COS_30 - ux * _SIN_30)),
+        (end[0] - arrow_size * (ux * _COS_30 - uy * _SIN_30),
+         end[1] - arrow_size * (uy * _COS_30 + ux * _SIN_30))
+    ]
 
 class BeerGameRenderer:
-    def __init__(self, screen_width: int = 1024, screen_height: int = 768):
+    ACTOR_NAMES = ["Retailer", "Wholesaler", "Distributor", "Factory"]
+
+    def __init__(self, screen_width: int = 1024, screen_height: int = 768, use_assets: bool = True):
         pygame.init()
         self.screen_width = screen_width
         self.screen_height = screen_height
@@ -26,6 +54,9 @@ class BeerGameRenderer:
             'customer_order': (52, 152, 219), # Blue
             'info_text': (127, 140, 141)      # Gray
         }
+        # Bind each color to an attribute (e.g. self._c_panel) to skip dict lookups while drawing
+        for name, color in self.COLORS.items():
+            setattr(self, f'_c_{name}', color)
 
         # Fonts
         self.title_font = pygame.font.Font(None, 36)
@@ -42,15 +73,19 @@ class BeerGameRenderer:
         self.box_spacing = 220  # Space between boxes
         self.start_x_offset = 50  # Reduced from 200 to move everything left
         self.arrow_offset = 30
+        self._half_bw = self.box_width // 2
+        self._third_bw = self.box_width // 3
+        self._two_third_bw = 2 * self.box_width // 3
         
         # Updated image dimensions to maintain square aspect ratio
         self.image_size = min(self.box_width, self.box_height - 40)
         self.image_box_gap = 10
 
-        # Load images
+        # Load images, from the baked assets when they match the layout, otherwise from the PNGs
         self.images = {}
         image_size = (self.image_size, self.image_size)  # Square images
         current_dir = os.path.dirname(os.path.abspath(__file__))
+        assets = self._load_assets(os.path.join(current_dir, ASSETS_FILE)) if use_assets else {}
         image_paths = {
             'Retailer': os.path.join(current_dir, 'retailer.png'),
             'Wholesaler': os.path.join(current_dir, 'wholesaler.png'),
@@ -60,412 +95,507 @@ class BeerGameRenderer:
         }
         
         for name, path in image_paths.items():
+            size = image_size if name != 'Beer' else (self.image_size//2, self.image_size//2)
+            pixels = assets.get(name)
             try:
-                image = pygame.image.load(path)
-                if name != 'Beer':
-                    self.images[name] = pygame.transform.scale(image, image_size)
+                if pixels is not None and pixels.shape == (size[1], size[0], 4):
+                    image = pygame.image.frombuffer(pixels.tobytes(), size, 'RGBA')
                 else:
-                    self.images[name] = pygame.transform.scale(image, (self.image_size//2, self.image_size//2))
+                    image = pygame.transform.scale(pygame.image.load(path), size)
+                self.images[name] = self._convert_alpha(image)
             except pygame.error as e:
                 print(f"Warning: Could not load image {path}: {e}")
                 self.images[name] = None
-    def _draw_customer_box(self, x: int, y: int):
-        """Draw the customer box as a round-cornered box below the main row"""
+
+        # Rendered text surfaces, keyed by (text, font, color)
+        self._text_cache = OrderedDict()
+        self._text_cache_size = 512
+
+        # Value bubble backgrounds, keyed by (color, width, height)
+        self._bubble_cache = {}
+
+        # Pre-rendered actor values, keyed by (title, labels, colors)
+        self._actor_box_cache = OrderedDict()
+        self._actor_box_cache_size = 256
+
+        # Fixed geometry: actor boxes, customer box and (start, end, type) of the value arrows
+        self._positions = self._actor_positions()
+        self._customer_box_coords = self._customer_box_rect(*self._positions[0])
+        self._arrow_endpoints = self._arrows()
+
+        # Everything that does not change between frames is drawn only once
+        self._background = self._build_background()
+        self._last_state = None
+
+    @staticmethod
+    def _load_assets(path: str) -> dict:
+        """Read the baked (height, width, 4) RGBA arrays by image name, if the file exists"""
+        try:
+            with np.load(path) as assets:
+                return {name: assets[name] for name in assets.files}
+        except (OSError, ValueError):
+            return {}
+
+    def save_assets(self, path: str):
+        """Write the loaded images, scaled to their display size, as RGBA arrays to an .npz file"""
+        np.savez_compressed(path, **{
+            name: np.frombuffer(pygame.image.tostring(image, 'RGBA'), dtype=np.uint8).reshape(
+                image.get_height(), image.get_width(), 4)
+            for name, image in self.images.items() if image is not None
+        })
+
+    @staticmethod
+    def _convert_alpha(image: pygame.Surface) -> pygame.Surface:
+        """Convert an image to the fast per-pixel alpha format for blitting"""
+        try:
+            return image.convert_alpha()
+        except pygame.error:
+            # No display mode is set when rendering off-screen, so copy the pixels
+            # into a surface with the default alpha format instead
+            converted = pygame.Surface(image.get_size(), pygame.SRCALPHA, 32)
+            converted.blit(image, (0, 0), special_flags=pygame.BLEND_RGBA_MAX)
+            return converted
+
+    def _render_text(self, text: str, font: pygame.font.Font, color: tuple) -> pygame.Surface:
+        """Render text with font and color, reusing the surface from earlier frames"""
+        key = (text, id(font), color)
+        surface = self._text_cache.get(key)
+        if surface is None:
+            surface = font.render(text, True, color)
+            self._text_cache[key] = surface
+            if len(self._text_cache) > self._text_cache_size:
+                self._text_cache.popitem(last=False)
+        else:
+            self._text_cache.move_to_end(key)
+        return surface
+
+    def _customer_box_rect(self, x: int, y: int) -> Tuple[int, int, int, int]:
+        """Position and size of the customer box below the retailer box at (x, y)"""
         box_width = 120
         box_height = 80
-        radius = 20
         
         # Calculate position (centered below retailer)
         box_x = x + (self.box_width - box_width) // 2
         box_y = y + self.box_height + 60  # Move below main row
+        return box_x, box_y, box_width, box_height
+
+    def _draw_customer_box(self):
+        """Draw the customer box as a round-cornered box below the main row"""
+        radius = 20
+        box_x, box_y, box_width, box_height = self._customer_box_coords
         
         # Draw rounded rectangle
         rect = pygame.Rect(box_x, box_y, box_width, box_height)
-        pygame.draw.rect(self.screen, self.COLORS['panel'], rect, border_radius=radius)
-        pygame.draw.rect(self.screen, self.COLORS['panel_border'], rect, 1, border_radius=radius)
+        pygame.draw.rect(self.screen, self._c_panel, rect, border_radius=radius)
+        pygame.draw.rect(self.screen, self._c_panel_border, rect, 1, border_radius=radius)
         
         # Title
-        title_text = self.header_font.render("Customer", True, self.COLORS['text'])
+        title_text = self._render_text("Customer", self.header_font, self._c_text)
         title_rect = title_text.get_rect(centerx=rect.centerx, top=rect.top + 5)
         self.screen.blit(title_text, title_rect)
         
         return box_x, box_y, box_width, box_height 
-    def _draw_actor_box(self, x: int, y: int, title: str, data: dict):
-        """Draw an actor box with costs displayed above the image"""
-        # Draw costs first (above everything)
-        holding_cost = data.get('holding_cost', 0)
-        backorder_cost = data.get('backorder_cost', 0)
-        cost_y = y - self.image_size - self.image_box_gap - 25  # Position above image
-        
-        cost_text = self.cost_font.render(
-            f"H: ${holding_cost:.1f} | B: ${backorder_cost:.1f}",
-            True,
-            self.COLORS['cost']
-        )
-        cost_rect = cost_text.get_rect(centerx=x + self.box_width//2, top=cost_y)
-        self.screen.blit(cost_text, cost_rect)
-
+    def _draw_actor_frame(self, x: int, y: int, title: str):
+        """Draw the static parts of an actor box: image, frame and title"""
         # Draw image
         if self.images.get(title):
             image_y = y - self.image_size - self.image_box_gap
             image_rect = self.images[title].get_rect(
-                centerx=x + self.box_width//2,
+                centerx=x + self._half_bw,
                 top=image_y
             )
             self.screen.blit(self.images[title], image_rect)
 
         # Main box
         rect = pygame.Rect(x, y, self.box_width, self.box_height)
-        pygame.draw.rect(self.screen, self.COLORS['panel'], rect)
-        pygame.draw.rect(self.screen, self.COLORS['panel_border'], rect, 1)
+        pygame.draw.rect(self.screen, self._c_panel, rect)
+        pygame.draw.rect(self.screen, self._c_panel_border, rect, 1)
 
         # Title
         title_y = rect.top + 5
-        title_text = self.header_font.render(title, True, self.COLORS['text'])
+        title_text = self._render_text(title, self.header_font, self._c_text)
         title_rect = title_text.get_rect(centerx=rect.centerx, top=title_y)
         self.screen.blit(title_text, title_rect)
 
-        # Inventory value
-        inventory_color = self.COLORS['positive'] if data['inventory'] >= 0 else self.COLORS['negative']
-        inventory_text = self.value_font.render(f"Stock: {int(data['inventory'])}", True, inventory_color)
-        inventory_rect = inventory_text.get_rect(
-            centerx=rect.centerx,
-            top=title_rect.bottom + 10
+    def _actor_labels(self, data: dict) -> tuple:
+        """Displayed (costs, stock, stock color, backorders or None) of an actor, at display precision"""
+        holding_cost = data.get('holding_cost', 0)
+        backorder_cost = data.get('backorder_cost', 0)
+        return (
+            f"H: ${holding_cost:.1f} | B: ${backorder_cost:.1f}",
+            f"Stock: {int(data['inventory'])}",
+            self._c_positive if data['inventory'] >= 0 else self._c_negative,
+            f"Backorders: {int(data['backorders'])}" if data['backorders'] > 0 else None,
         )
-        self.screen.blit(inventory_text, inventory_rect)
+
+    def _draw_actor_box(self, x: int, y: int, title: str, labels: tuple) -> List[pygame.Rect]:
+        """Draw the values of an actor box, with costs displayed above the image, and return the drawn rects"""
+        key = (title,) + labels
+        cached = self._actor_box_cache.get(key)
+        if cached is None:
+            cached = self._render_actor_box(x, y, title, *labels)
+            self._actor_box_cache[key] = cached
+            if len(self._actor_box_cache) > self._actor_box_cache_size:
+                self._actor_box_cache.popitem(last=False)
+        else:
+            self._actor_box_cache.move_to_end(key)
+        surface, rect = cached
+        return [self.screen.blit(surface, rect)]
+
+    def _render_actor_box(self, x: int, y: int, title: str, cost_label: str, inventory_label: str,
+                          inventory_color: tuple, backorder_label: str) -> Tuple[pygame.Surface, pygame.Rect]:
+        """
+        Render the values of an actor box over a copy of the background, so the
+        result is opaque and drawn with a single blit. Actor values are the first
+        layer above the background, which keeps the output identical to drawing
+        the texts directly on the screen.
+        """
+        center_x = x + self._half_bw
+
+        # Costs above the image
+        cost_y = y - self.image_size - self.image_box_gap - 25  # Position above image
+        cost_text = self._render_text(cost_label, self.cost_font, self._c_cost)
+        texts = [(cost_text, cost_y)]
+
+        # Inventory value, below the title drawn on the background
+        title_height = self._render_text(title, self.header_font, self._c_text).get_height()
+        inventory_y = y + 5 + title_height + 10
+        inventory_text = self._render_text(inventory_label, self.value_font, inventory_color)
+        texts.append((inventory_text, inventory_y))
 
         # Backorder info
-        if data['backorders'] > 0:
-            backorder_text = self.value_font.render(
-                f"Backorders: {int(data['backorders'])}",
-                True,
-                self.COLORS['negative']
-            )
-            backorder_rect = backorder_text.get_rect(
-                centerx=rect.centerx,
-                top=inventory_rect.bottom + 10
-            )
-            self.screen.blit(backorder_text, backorder_rect)
-    def _draw_cost_summary(self, x: int, y: int, holding_cost: float, backorder_cost: float):
-        """Draw a small cost summary below the actor box"""
-        text = self.cost_font.render(
-            f"H: ${holding_cost:.1f} | B: ${backorder_cost:.1f}",
-            True,
-            self.COLORS['text']
-        )
-        rect = text.get_rect(centerx=x + self.box_width/2, top=y + self.box_height + 5)
-        self.screen.blit(text, rect)
+        if backorder_label is not None:
+            backorder_text = self._render_text(backorder_label, self.value_font, self._c_negative)
+            texts.append((backorder_text, inventory_y + inventory_text.get_height() + 10))
+
+        text_rects = [pygame.Rect(center_x - text.get_width() // 2, text_y, *text.get_size())
+                      for text, text_y in texts]
+        area = text_rects[0].unionall(text_rects).clip(self._background.get_rect())
+        surface = self._background.subsurface(area).copy()
+        for (text, _), text_rect in zip(texts, text_rects):
+            surface.blit(text, (text_rect.x - area.x, text_rect.y - area.y))
+        return surface, area
 
-    def _draw_arrow_with_value(self, start: tuple, end: tuple, value: float, arrow_type: str):
+    def _arrow_color(self, arrow_type: str) -> tuple:
+        return self._c_arrow_shipment if arrow_type == "shipment" else self._c_arrow_order
+
+    def _draw_arrow(self, start: tuple, end: tuple, value: float, arrow_type: str):
         """Draw an arrow with a value bubble"""
-        color = self.COLORS['arrow_shipment'] if arrow_type == "shipment" else self.COLORS['arrow_order']
-        
-        # Draw the main line
-        pygame.draw.line(self.screen, color, start, end, 2)
-        
-        # Draw arrow head
-        angle = np.arctan2(end[1] - start[1], end[0] - start[0])
+        self._draw_arrow_lines([(start, end, arrow_type)])
+        self._draw_value_bubble(start, end, self._value_label(value), arrow_type)
+
+    def _draw_arrow_lines(self, arrows: List[Tuple[tuple, tuple, str]]):
+        """Draw the lines and heads of the given (start, end, type) arrows, grouped by color"""
+        screen = self.screen
+        draw_line = pygame.draw.line
+        draw_polygon = pygame.draw.polygon
         arrow_size = 10
-        arrow_points = [
-            end,
-            (end[0] - arrow_size * np.cos(angle - np.pi/6),
-             end[1] - arrow_size * np.sin(angle - np.pi/6)),
-            (end[0] - arrow_size * np.cos(angle + np.pi/6),
-             end[1] - arrow_size * np.sin(angle + np.pi/6))
-        ]
-        pygame.draw.polygon(self.screen, color, arrow_points)
+        for arrow_type in ("order", "shipment"):
+            color = self._arrow_color(arrow_type)
+            segments = [(start, end) for start, end, kind in arrows if kind == arrow_type]
+            
+            # Draw the main lines, then the arrow heads on top
+            for start, end in segments:
+                draw_line(screen, color, start, end, 2)
+            for start, end in segments:
+                draw_polygon(screen, color, _arrow_head_points(start, end, arrow_size))
 
-        # Draw value bubble
-        mid_x = (start[0] + end[0]) / 2
-        mid_y = (start[1] + end[1]) / 2
+    @staticmethod
+    def _value_label(value: float) -> str:
+        """Displayed text of an arrow value"""
         if value:
-            value_text = self.label_font.render(f"{value:.1f}", True, color)
-        else:
-            value_text = self.label_font.render(f"{0}", True, color)
-        value_rect = value_text.get_rect(center=(mid_x, mid_y))
+            return f"{value:.1f}"
+        return f"{0}"
+
+    def _draw_value_bubble(self, start: tuple, end: tuple, label: str, arrow_type: str) -> List[pygame.Rect]:
+        """Draw the value bubble with the given label in the middle of an arrow and return the drawn rects"""
+        color = self._arrow_color(arrow_type)
+
+        # Draw value bubble, centered on the middle of the arrow (half-way pixels round up)
+        value_text = self._render_text(label, self.label_font, color)
+        width, height = value_text.get_size()
+        left = (start[0] + end[0] + 1) // 2 - width // 2
+        top = (start[1] + end[1] + 1) // 2 - height // 2
         
         # White background for better readability
         padding = 5
-        bg_rect = value_rect.inflate(padding * 2, padding * 2)
-        pygame.draw.rect(self.screen, self.COLORS['panel'], bg_rect)
-        pygame.draw.rect(self.screen, color, bg_rect, 1)
-        self.screen.blit(value_text, value_rect)
-        
-    def _draw_arrow(self, start: Tuple[int, int], end: Tuple[int, int], 
-                   value: float, arrow_type: str = "order"):
-        """Draw an arrow with value between two points"""
-        color = (self.COLORS['arrow_order'] if arrow_type == "order" 
-                else self.COLORS['arrow_shipment'])
-        arrow_size = 10
-        
-        # Draw main line
-        pygame.draw.line(self.screen, color, start, end, 2)
-        
-        # Calculate arrow head
-        angle = np.arctan2(end[1] - start[1], end[0] - start[0])
-        arrow_points = [
-            end,
-            (end[0] - arrow_size * np.cos(angle - np.pi/6),
-             end[1] - arrow_size * np.sin(angle - np.pi/6)),
-            (end[0] - arrow_size * np.cos(angle + np.pi/6),
-             end[1] - arrow_size * np.sin(angle + np.pi/6))
-        ]
-        pygame.draw.polygon(self.screen, color, arrow_points)
-        
-        # Draw value bubble
-        mid_x = (start[0] + end[0]) / 2
-        mid_y = (start[1] + end[1]) / 2
-        radius = 15
-        
-        # Draw circular background
-        pygame.draw.circle(self.screen, self.COLORS['panel'], (int(mid_x), int(mid_y)), radius)
-        pygame.draw.circle(self.screen, color, (int(mid_x), int(mid_y)), radius, 1)
-        
-        # Draw value
-        value_text = self.label_font.render(f"{value:.1f}", True, color)
-        value_rect = value_text.get_rect(center=(mid_x, mid_y))
-        self.screen.blit(value_text, value_rect)
-        
-    def _draw_info_panel(self, week: int, costs: Dict[str, float]):
-        """Draw information panel with game status"""
-        panel_width = 250
-        panel_height = 120
-        
-        # Draw panel background with subtle shadow
-        shadow_offset = 3
-        shadow_rect = pygame.Rect(self.margin + shadow_offset, 
-                                self.margin + shadow_offset, 
-                                panel_width, panel_height)
-        pygame.draw.rect(self.screen, self.COLORS['panel_border'], shadow_rect)
-        
-        # Main panel
-        rect = pygame.Rect(self.margin, self.margin, panel_width, panel_height)
-        pygame.draw.rect(self.screen, self.COLORS['panel'], rect)
-        pygame.draw.rect(self.screen, self.COLORS['panel_border'], rect, 1)
-        
-        # Draw week
-        week_text = self.header_font.render(f"Week {week}", True, self.COLORS['text'])
-        self.screen.blit(week_text, (rect.left + 10, rect.top + 10))
-        
-        # Draw total costs
-        y = rect.top + 45
-        for label, value in costs.items():
-            text = self.label_font.render(f"Total {label}: ${value:,.2f}", 
-                                        True, self.COLORS['text'])
-            self.screen.blit(text, (rect.left + 10, y))
-            y += 25
-    def _draw_actor_with_box(self, x: int, y: int, title: str, inventory: float, 
-                           holding_cost: float, backorder_cost: float):
-        """Draw an actor with image above and box below including costs"""
-        # Draw image above the box if available
-        if self.images.get(title):
-            image_rect = pygame.Rect(x, y - self.image_height, self.box_width, self.image_height)
-            self.screen.blit(self.images[title], image_rect)
-        
-        # Draw box below
-        box_rect = pygame.Rect(x, y, self.box_width, self.box_height)
-        
-        # Draw box with slight shadow
-        shadow_offset = 2
-        shadow_rect = box_rect.copy()
-        shadow_rect.move_ip(shadow_offset, shadow_offset)
-        pygame.draw.rect(self.screen, self.COLORS['panel_border'], shadow_rect)
-        pygame.draw.rect(self.screen, self.COLORS['panel'], box_rect)
-        pygame.draw.rect(self.screen, self.COLORS['panel_border'], box_rect, 1)
-        
-        # Draw title
-        title_text = self.header_font.render(title, True, self.COLORS['text'])
-        title_rect = title_text.get_rect(centerx=box_rect.centerx, top=box_rect.top + 5)
-        self.screen.blit(title_text, title_rect)
-        
-        # Draw inventory value
-        color = self.COLORS['positive'] if inventory >= 0 else self.COLORS['negative']
-        inventory_text = self.value_font.render(f"Stock: {int(inventory)}", True, color)
-        inventory_rect = inventory_text.get_rect(
-            centerx=box_rect.centerx, 
-            top=title_rect.bottom + 10
-        )
-        self.screen.blit(inventory_text, inventory_rect)
-        
-        # Draw costs
-        y_offset = inventory_rect.bottom + 5
-        
-        # Holding cost
-        holding_text = self.cost_font.render(
-            f"Hold: ${holding_cost:.2f}", True, self.COLORS['cost']
-        )
-        holding_rect = holding_text.get_rect(
-            centerx=box_rect.centerx,
-            top=y_offset
-        )
-        self.screen.blit(holding_text, holding_rect)
-        
-        # Backorder cost
-        backorder_text = self.cost_font.render(
-            f"Back: ${backorder_cost:.2f}", True, self.COLORS['cost']
-        )
-        backorder_rect = backorder_text.get_rect(
-            centerx=box_rect.centerx,
-            top=holding_rect.bottom + 5
-        )
-        self.screen.blit(backorder_text, backorder_rect)
-    def render(self, state: dict) -> np.ndarray:
-        """Render the current state of the beer game"""
-        self.screen.fill(self.COLORS['background'])
-        
-        # Calculate layout
+        bubble = self._bubble(color, width + padding * 2, height + padding * 2)
+        drawn = self.screen.blit(bubble, (left - padding, top - padding))
+        self.screen.blit(value_text, (left, top))
+        return [drawn]
+
+    def _bubble(self, color: tuple, width: int, height: int) -> pygame.Surface:
+        """Return the white, color bordered background of a value bubble, cached by size"""
+        key = (color, width, height)
+        bubble = self._bubble_cache.get(key)
+        if bubble is None:
+            bubble = pygame.Surface((width, height))
+            bubble.fill(self._c_panel)
+            pygame.draw.rect(bubble, color, bubble.get_rect(), 1)
+            self._bubble_cache[key] = bubble
+        return bubble
+
+    def _actor_positions(self) -> List[Tuple[int, int]]:
+        """Top-left corner of each actor box, from retailer to factory"""
         center_y = self.screen_height // 2 - 50  # Move everything up to make room for customer
         start_x = self.start_x_offset
-        
-        # Draw actors and arrows
-        positions = []
-        names = ["Retailer", "Wholesaler", "Distributor", "Factory"]
-        
-        for i, name in enumerate(names):
-            x = start_x + i * self.box_spacing
-            y = center_y - self.box_height // 2
-            positions.append((x, y))
-            
-            # Prepare data for actor box
-            actor_data = {
-                'inventory': state['inventory_levels'][i],
-                'backorders': state.get('backorders', [0, 0, 0, 0])[i],
-                'holding_cost': state['holding_cost'][i],
-                'backorder_cost': state['backorder_cost'][i]
-            }
-            
-            self._draw_actor_box(x, y, name, actor_data)
+        return [
+            (start_x + i * self.box_spacing, center_y - self.box_height // 2)
+            for i in range(len(self.ACTOR_NAMES))
+        ]
 
-        # Draw customer box below retailer
-        customer_box = self._draw_customer_box(positions[0][0], positions[0][1])
-        
-        # Draw arrows between positions
+    def _arrows(self) -> List[Tuple[tuple, tuple, str]]:
+        """Start, end and type of every arrow carrying a value, in drawing order"""
+        positions = self._positions
+        arrows = []
+
+        # Arrows between positions
         for i in range(len(positions) - 1):
             # Orange order arrows (downstream to upstream)
             order_start = (positions[i][0] + self.box_width, positions[i][1] + self.arrow_offset)
             order_end = (positions[i+1][0], positions[i+1][1] + self.arrow_offset)
-            self._draw_arrow_with_value(order_start, order_end, state['orders'][i], "order")
+            arrows.append((order_start, order_end, "order"))
             
             # Blue shipment arrows (upstream to downstream)
             ship_start = (positions[i+1][0], positions[i+1][1] - self.arrow_offset)
             ship_end = (positions[i][0] + self.box_width, positions[i][1] - self.arrow_offset)
-            self._draw_arrow_with_value(ship_start, ship_end, state['shipments'][i+1], "shipment")
+            arrows.append((ship_start, ship_end, "shipment"))
         
         # Factory self-loops
         factory_pos = positions[-1]
         
         # Factory order self-loop (orange)
-        self._draw_arrow_with_value(
+        arrows.append((
             (factory_pos[0] + self.box_width, factory_pos[1] + self.arrow_offset * 2),
             (factory_pos[0] + self.box_width - 30, factory_pos[1] + self.arrow_offset * 2),
-            state['orders'][-1],
             "order"
-        )
+        ))
         
         # Factory shipment self-loop (blue)
-        self._draw_arrow_with_value(
+        arrows.append((
             (factory_pos[0] + self.box_width - 30, factory_pos[1] - self.arrow_offset * 2),
             (factory_pos[0] + self.box_width, factory_pos[1] - self.arrow_offset * 2),
-            state['shipments'][-1],
             "shipment"
-        )
+        ))
 
-        # Draw arrows between customer and retailer
-        customer_box_x, customer_box_y, customer_box_width, customer_box_height = customer_box
+        # Arrows between customer and retailer
+        customer_box_x, customer_box_y, customer_box_width, customer_box_height = self._customer_box_coords
 
         # Orange order arrow from customer to retailer (bottom to top)
         order_start = (customer_box_x + customer_box_width//3, customer_box_y)  # From top of customer
-        order_end = (positions[0][0] + self.box_width//3, positions[0][1] + self.box_height)  # To bottom of retailer
-        self._draw_arrow_with_value(
-            order_start, 
-            order_end, 
-            state.get('customer', {}).get('orders', 0), 
-            "order"
-        )
+        order_end = (positions[0][0] + self._third_bw, positions[0][1] + self.box_height)  # To bottom of retailer
+        arrows.append((order_start, order_end, "order"))
 
         # Blue shipment arrow from retailer to customer (bottom to top)
-        ship_start = (positions[0][0] + 2*self.box_width//3, positions[0][1] + self.box_height)  # From bottom of retailer
+        ship_start = (positions[0][0] + self._two_third_bw, positions[0][1] + self.box_height)  # From bottom of retailer
         ship_end = (customer_box_x + 2*customer_box_width//3, customer_box_y)  # To top of customer
-        self._draw_arrow_with_value(
-            ship_start, 
-            ship_end, 
-            state.get('customer', {}).get('incoming_shipments', 0),
-            "shipment"
-        )
+        arrows.append((ship_start, ship_end, "shipment"))
+
+        return arrows
+
+    def _build_background(self) -> pygame.Surface:
+        """Draw all frame-invariant elements once and return them as a surface"""
+        self.screen.fill(self._c_background)
+
+        for (x, y), name in zip(self._positions, self.ACTOR_NAMES):
+            self._draw_actor_frame(x, y, name)
+
+        # Draw customer box below retailer
+        self._draw_customer_box()
 
-        # Draw game stats
-        self._draw_game_stats(state['week'], {
+        self._draw_arrow_lines(self._arrow_endpoints)
+
+        self._draw_stats_panel()
+        self._draw_legend_frame()
+        return self.screen.copy()
+
+    def _dynamic_elements(self, state: dict) -> list:
+        """
+        List the per-frame elements in drawing order as (key, value, draw) tuples,
+        where value holds everything the element depends on and draw() paints it
+        on the screen and returns the drawn rects. Values are the displayed labels,
+        so changes below display precision do not cause a redraw.
+        """
+        elements = []
+
+        # Actor values
+        for i, ((x, y), name) in enumerate(zip(self._positions, self.ACTOR_NAMES)):
+            # Prepare data for actor box
+            actor_data = {
+                'inventory': state['inventory_levels'][i],
+                'backorders': state.get('backorders', [0, 0, 0, 0])[i],
+                'holding_cost': state['holding_cost'][i],
+                'backorder_cost': state['backorder_cost'][i]
+            }
+            labels = self._actor_labels(actor_data)
+            elements.append((('actor', i), labels, partial(self._draw_actor_box, x, y, name, labels)))
+
+        # Arrow values, in the order of _arrow_endpoints
+        orders = state['orders']
+        shipments = state['shipments']
+        customer = state.get('customer', {})
+        values = []
+        for i in range(len(self.ACTOR_NAMES) - 1):
+            values.append(orders[i])
+            values.append(shipments[i+1])
+        values += [
+            orders[-1],
+            shipments[-1],
+            customer.get('orders', 0),
+            customer.get('incoming_shipments', 0),
+        ]
+        value_label = self._value_label
+        for i, ((start, end, arrow_type), value) in enumerate(zip(self._arrow_endpoints, values)):
+            label = value_label(value)
+            elements.append((('arrow', i), label,
+                             partial(self._draw_value_bubble, start, end, label, arrow_type)))
+
+        # Game stats and total beers
+        costs = {
             "Total Holding Cost": sum(state['holding_cost']),
             "Total Backorder Cost": sum(state['backorder_cost'])
-        })
-        self._legend(int(state['total_beers']))
-        return np.transpose(
-            pygame.surfarray.array3d(self.screen),
-            (1, 0, 2)
-        )
-    def _legend(self, total_beers : int):  # Add state parameter
-        # Draw legend in bottom right
+        }
+        labels = self._stats_labels(state['week'], costs)
+        elements.append(('stats', labels, partial(self._draw_game_stats, labels)))
+        total_beers = int(state['total_beers'])
+        elements.append(('total_beers', total_beers, partial(self._legend, total_beers)))
+        return elements
+
+    def render_dirty(self, state: dict) -> List[pygame.Rect]:
+        """
+        Update the screen for the given state, redrawing only the elements that
+        changed since the previous frame on top of the static background.
+
+        Returns:
+            list: The screen areas that changed, e.g. for pygame.display.update
+        """
+        if self.screen.get_locked():
+            # A frame returned by render() still views the screen: leave it to its
+            # owner and keep drawing on a copy
+            self.screen = self.screen.copy()
+
+        elements = self._dynamic_elements(state)
+        last_state = self._last_state
+        if last_state is None:
+            self.screen.blit(self._background, (0, 0))
+            self._last_state = {key: (value, draw()) for key, value, draw in elements}
+            return [self.screen.get_rect()]
+
+        redraw = {key for key, value, _ in elements if last_state[key][0] != value}
+        dirty = [rect for key in redraw for rect in last_state[key][1]]
+        while redraw:
+            # Elements overlapping an erased area have to be drawn again as well
+            grown = True
+            while grown:
+                grown = False
+                for key, _, _ in elements:
+                    rects = last_state[key][1]
+                    if key not in redraw and any(rect.collidelist(dirty) != -1 for rect in rects):
+                        redraw.add(key)
+                        dirty += rects
+                        grown = True
+
+            for rect in dirty:
+                self.screen.blit(self._background, rect, rect)
+            drawn = {key: (value, draw()) for key, value, draw in elements if key in redraw}
+            new_rects = [rect for _, rects in drawn.values() for rect in rects]
+            dirty += new_rects
+
+            # New content spilling over an untouched element means starting over with it included
+            spilled = {key for key, _, _ in elements
+                       if key not in redraw
+                       and any(rect.collidelist(new_rects) != -1 for rect in last_state[key][1])}
+            last_state.update(drawn)
+            if not spilled:
+                break
+            redraw |= spilled
+            dirty += [rect for key in spilled for rect in last_state[key][1]]
+        return dirty
+
+    def render(self, state: dict) -> np.ndarray:
+        """
+        Render the current state of the beer game as a read-only (height, width, 3)
+        RGB array. The array is a view of the screen pixels rather than a copy, so
+        it is not C-contiguous; it stays valid after later renders.
+        """
+        self.render_dirty(state)
+
+        frame = pygame.surfarray.pixels3d(self.screen).transpose(1, 0, 2)
+        frame.flags.writeable = False
+        return frame
+
+    def _draw_legend_frame(self):
+        """Draw the static part of the legend in bottom right"""
         legend_x = self.screen_width - 250  # Position from right edge
         legend_y = self.screen_height - 200  # Position from bottom
 
         # Draw shipping arrow example (blue)
         ship_start = (legend_x, legend_y)
         ship_end = (legend_x + 50, legend_y)
-        self._draw_arrow_with_value(ship_start, ship_end, 0, "shipment")
-        ship_text = self.label_font.render("Shipping", True, self.COLORS['arrow_shipment'])
+        self._draw_arrow(ship_start, ship_end, 0, "shipment")
+        ship_text = self._render_text("Shipping", self.label_font, self._c_arrow_shipment)
         self.screen.blit(ship_text, (legend_x + 70, legend_y - 10))
 
         # Draw order arrow example (orange)
         order_start = (legend_x, legend_y + 40)
         order_end = (legend_x + 50, legend_y + 40)
-        self._draw_arrow_with_value(order_start, order_end, 0, "order")
-        order_text = self.label_font.render("Order", True, self.COLORS['arrow_order'])
+        self._draw_arrow(order_start, order_end, 0, "order")
+        order_text = self._render_text("Order", self.label_font, self._c_arrow_order)
         self.screen.blit(order_text, (legend_x + 70, legend_y + 30))
 
-        # Draw beer icon and total (using already loaded image)
+        # Draw beer icon (using already loaded image)
         beer_rect = self.images['Beer'].get_rect(topleft=(legend_x, legend_y + 80))
         self.screen.blit(self.images['Beer'], beer_rect)
 
+    def _legend(self, total_beers : int) -> List[pygame.Rect]:
+        """Draw the total number of beers delivered next to the legend and return the drawn rects"""
+        legend_x = self.screen_width - 250  # Position from right edge
+        legend_y = self.screen_height - 200  # Position from bottom
+
         # Draw total beers text
-        total_text = self.label_font.render(f"Total beers delivered : {total_beers}", 
-                                        True, self.COLORS['text'])
-        self.screen.blit(total_text, (legend_x + 35, legend_y + 82))
-    def _draw_game_stats(self, week: int, costs: dict):
-        """Draw game statistics with proper width and alignment"""
+        total_text = self._render_text(f"Total beers delivered : {total_beers}",
+                                       self.label_font, self._c_text)
+        return [self.screen.blit(total_text, (legend_x + 35, legend_y + 82))]
+
+    def _stats_panel_rect(self) -> pygame.Rect:
         panel_width = 300  # Increased width
         panel_height = 120
-        
+        return pygame.Rect(self.margin, self.margin, panel_width, panel_height)
+
+    def _draw_stats_panel(self):
+        """Draw the game statistics panel with a shadow effect"""
+        rect = self._stats_panel_rect()
+
         # Draw panel with shadow effect
         shadow_offset = 3
-        shadow_rect = pygame.Rect(
-            self.margin + shadow_offset,
-            self.margin + shadow_offset,
-            panel_width,
-            panel_height
-        )
-        pygame.draw.rect(self.screen, self.COLORS['panel_border'], shadow_rect)
+        shadow_rect = rect.move(shadow_offset, shadow_offset)
+        pygame.draw.rect(self.screen, self._c_panel_border, shadow_rect)
         
         # Main panel
-        rect = pygame.Rect(self.margin, self.margin, panel_width, panel_height)
-        pygame.draw.rect(self.screen, self.COLORS['panel'], rect)
-        pygame.draw.rect(self.screen, self.COLORS['panel_border'], rect, 1)
+        pygame.draw.rect(self.screen, self._c_panel, rect)
+        pygame.draw.rect(self.screen, self._c_panel_border, rect, 1)
+
+    @staticmethod
+    def _stats_labels(week: int, costs: dict) -> tuple:
+        """Displayed week and cost lines of the game statistics"""
+        return (f"Week {week}",) + tuple(f"{label}: ${value:,.2f}" for label, value in costs.items())
+
+    def _draw_game_stats(self, labels: tuple) -> List[pygame.Rect]:
+        """Draw the game statistics lines with proper width and alignment and return the drawn rects"""
+        rect = self._stats_panel_rect()
         
         # Draw week number
-        week_text = self.header_font.render(f"Week {week}", True, self.COLORS['text'])
-        week_rect = week_text.get_rect(left=rect.left + 15, top=rect.top + 15)
-        self.screen.blit(week_text, week_rect)
+        left = rect.left + 15
+        week_text = self._render_text(labels[0], self.header_font, self._c_text)
+        drawn = [self.screen.blit(week_text, (left, rect.top + 15))]
         
         # Draw costs with proper spacing
-        y = week_rect.bottom + 15
-        for label, value in costs.items():
-            text = self.info_font.render(
-                f"{label}: ${value:,.2f}",
-                True,
-                self.COLORS['info_text']
-            )
-            text_rect = text.get_rect(left=rect.left + 15, top=y)
-            self.screen.blit(text, text_rect)
+        y = rect.top + 15 + week_text.get_height() + 15
+        for label in labels[1:]:
+            text = self._render_text(label, self.info_font, self._c_info_text)
+            drawn.append(self.screen.blit(text, (left, y)))
             y += 25  # Increased vertical spacing
+        return drawn
 
     def close(self):
         pygame.quit()
\ No newline at end of file
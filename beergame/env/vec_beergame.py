@@ -0,0 +1,206 @@
+# Directory: beergame/
+# File: beergame/env/vec_beergame.py
+import numpy as np
+from gymnasium.spaces import Box, Dict
+from gymnasium.vector.utils import batch_space
+
+
+class BeerGameVecEnv:
+    """
+    Batched Beer Game simulator running N independent supply chains in lockstep.
+
+    All state is held in (N, 4) arrays (one row per environment, one column per
+    echelon from retailer to factory) and every week is advanced with a single
+    vectorized update, so only the loop over weeks remains in Python.
+    Like gymnasium vector environments, reset() returns (observations, infos)
+    and step() returns (observations, rewards, terminations, truncations, infos).
+    Observations are a dict of (N, 4) arrays and rewards an (N, 4) array of
+    per-agent negative costs. All environments end together after 52 weeks.
+
+    Note: observations are copies of the state, so they can be kept (e.g. in a
+    rollout buffer) without being overwritten by later steps.
+    """
+    metadata = {
+        "name": "beergame_vec_v0",
+    }
+
+    def __init__(self,
+                n_envs=1,
+                holding_cost=[1.0, 1.0, 1.0, 1.0],
+                backorder_cost=[2.0, 2.0, 2.0, 2.0],
+                init_inv_level=[12, 12, 12, 12],
+                init_orders=[0, 0, 0, 0],
+                init_shipments=[4, 4, 4, 4],
+                base_demand=8.0,
+                seed=None):
+        """Initialize the vectorized Beer Game environment."""
+        self._rng = np.random.default_rng(seed)
+
+        self.num_envs = n_envs
+        self.num_players = 4
+        self.holding_cost = np.asarray(holding_cost, dtype=np.float32)
+        self.backorder_cost = np.asarray(backorder_cost, dtype=np.float32)
+        self.init_inv_level = init_inv_level
+        self.init_orders = init_orders
+        self.init_shipments = init_shipments
+        self.base_demand = base_demand
+
+        self.possible_agents = ["retailer", "wholesaler", "distributor", "factory"]
+
+        # Customer demand parameters
+        self._season_amp = 2.0
+        self._noise_std = 1.0
+        self._spike_p = 0.1
+        self._max_spike = 10.0
+
+        # Seasonal demand component for each week of the 52 weeks cycle
+        self._seasonal_table = self._season_amp * np.sin(2 * np.pi * np.arange(52) / 52)
+
+        # Spaces of a single environment, with one column per agent
+        self.single_action_space = Box(low=0, high=50, shape=(self.num_players,), dtype=np.float32)
+        self.single_observation_space = Dict({
+            key: Box(low=0, high=float('inf'), shape=(self.num_players,), dtype=np.float32)
+            for key in ["inventory", "backorders", "orders", "incoming_shipments",
+                        "holding_cost", "backorder_cost"]
+        })
+        self._build_batched_spaces()
+
+    def _build_batched_spaces(self):
+        """Build the batched spaces for the current number of environments."""
+        self.action_space = batch_space(self.single_action_space, self.num_envs)
+        self.observation_space = batch_space(self.single_observation_space, self.num_envs)
+
+    def _generate_customer_demand(self):
+        """
+        Generate one customer demand per environment, following the same
+        pattern as the single environment (base level, seasonality, noise
+        and occasional spikes).
+        """
+        n = self.num_envs
+        seasonal_factor = self._seasonal_table[self.week % 52]
+        random_noise = self._rng.normal(0.0, self._noise_std, n)
+        spike = self._max_spike * self._rng.binomial(1, self._spike_p, n)
+
+        demand = self.base_demand + seasonal_factor + random_noise + spike
+        return np.maximum(demand, 0.0).astype(np.float32)
+
+    def reset(self, n_envs=None, seed=None):
+        """
+        Reset all environments to the initial state, optionally resizing the batch.
+
+        Returns:
+            tuple: (observations, infos)
+        """
+        if seed is not None:
+            self._rng = np.random.default_rng(seed)
+        if n_envs is not None and n_envs != self.num_envs:
+            self.num_envs = n_envs
+            self._build_batched_spaces()
+
+        shape = (self.num_envs, self.num_players)
+        self.week = 0
+        self.total_beers = np.zeros(self.num_envs, dtype=np.float32)
+
+        # Game state as one (4, N, 4) block; the named arrays are views of it
+        # and are only updated in place
+        self._state = np.empty((4,) + shape, dtype=np.float32)
+        self._bind_state_views()
+        self.inventory_levels[:] = self.init_inv_level
+        self.backorders.fill(0)
+        self.orders[:] = self.init_orders
+        self.incoming_shipments[:] = self.init_shipments
+        self.customer_orders = np.zeros(self.num_envs, dtype=np.float32)
+        self.customer_shipments = np.zeros(self.num_envs, dtype=np.float32)
+        self._demand_buf = np.empty(shape, dtype=np.float32)
+        self._ship_buf = np.empty(shape, dtype=np.float32)
+
+        return self.observe(), {}
+
+    def _bind_state_views(self):
+        """Bind the named state arrays as views of the state block."""
+        self.inventory_levels = self._state[0]
+        self.backorders = self._state[1]
+        self.orders = self._state[2]
+        self.incoming_shipments = self._state[3]
+
+    def __setstate__(self, state):
+        # Copies and unpickled arrays no longer alias each other, so bind the views again
+        self.__dict__.update(state)
+        if "_state" in state:
+            self._bind_state_views()
+
+    def observe(self):
+        """
+        Return the batched observation as a dict of (N, 4) arrays.
+
+        The arrays are copies: later steps do not modify observations that were
+        already returned.
+        """
+        shape = (self.num_envs, self.num_players)
+        state = self._state.copy()
+        return {
+            "inventory": state[0],
+            "backorders": state[1],
+            "orders": state[2],
+            "incoming_shipments": state[3],
+            "holding_cost": np.broadcast_to(self.holding_cost, shape).copy(),
+            "backorder_cost": np.broadcast_to(self.backorder_cost, shape).copy(),
+        }
+
+    def step(self, actions):
+        """
+        Advance every environment by one week.
+
+        Args:
+            actions (np.ndarray): Orders of shape (N, 4), one column per agent
+
+        Returns:
+            tuple: (observations, rewards, terminations, truncations, infos) where
+                rewards has shape (N, 4) and terminations/truncations shape (N,)
+
+        Raises:
+            RuntimeError: If the episode has ended; call reset() to start a new one
+        """
+        if self.week >= 52:
+            raise RuntimeError("step() called after the episode ended, call reset() first")
+        np.clip(np.asarray(actions, dtype=np.float32).reshape(self.orders.shape),
+                self.single_action_space.low, self.single_action_space.high,
+                out=self.orders)
+
+        self._update_state()
+        self.week += 1
+
+        rewards = -(self.holding_cost * self.inventory_levels
+                    + self.backorder_cost * self.backorders)
+        terminations = np.full(self.num_envs, self.week >= 52)
+        truncations = np.zeros(self.num_envs, dtype=bool)
+
+        return self.observe(), rewards, terminations, truncations, {}
+
+    def _update_state(self):
+        """Update the game state of every environment after all agents have acted."""
+        self.customer_orders[:] = self._generate_customer_demand()
+
+        demand = self._demand_buf
+        demand[:, 0] = self.customer_orders
+        demand[:, 1:] = self.orders[:, :-1]
+
+        # Receive orders and shipments, then ship as much as possible downstream
+        # (all outstanding orders, limited by stock: min(inventory, backorders))
+        self.backorders += demand
+        self.inventory_levels += self.incoming_shipments
+        ship = np.minimum(self.inventory_levels, self.backorders, out=self._ship_buf)
+        self.inventory_levels -= ship
+        self.backorders -= ship
+
+        # Retailer ships to customer
+        self.customer_shipments[:] = ship[:, 0]
+        self.total_beers += ship[:, 0]
+
+        # Each echelon receives what its upstream neighbour shipped;
+        # the factory's incoming shipments are based on its own orders
+        self.incoming_shipments[:, :-1] = ship[:, 1:]
+        self.incoming_shipments[:, -1] = self.orders[:, -1]
+
+    def close(self):
+        pass
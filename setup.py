@@ -6,8 +6,11 @@ setup(
     description="Beer Game Environment for PettingZoo",
     packages=find_packages(),
     package_data={
-        'beergame.env': ['*.png'],
+        'beergame.env': ['*.png', 'assets.npz'],
     },
     install_requires=[],
+    extras_require={
+        'numba': ['numba'],
+    },
     python_requires=">=3.7",
 )
\ No newline at end of file